@@ -1,15 +1,23 @@
 import mysql.connector
 import pandas as pd
-import openpyxl
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.chart import BarChart, LineChart, Reference
 from openpyxl.chart.marker import Marker
 from openpyxl.chart.series import Series
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, numbers
-from decimal import Decimal
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle, numbers
+from openpyxl.utils import get_column_letter
 from datetime import datetime
 from dotenv import load_dotenv
 import os
 import sys
+import asyncio
+import logging
+
+# Registro de diagnóstico (usar level=logging.DEBUG para ver el detalle de cada paso)
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+log = logging.getLogger("jcepf")
 
 # Determinar el directorio base
 if getattr(sys, 'frozen', False):  # Ejecutable
@@ -19,11 +27,11 @@ else:  # Script
 
 # Cargar el archivo .env
 env_path = os.path.join(BASE_DIR, '.env')
-print(env_path)
+log.debug("Archivo .env: %s", env_path)
 if os.path.exists(env_path):
     load_dotenv(dotenv_path=env_path)
 else:
-    print(f"Archivo .env no encontrado en {env_path}")
+    log.error("Archivo .env no encontrado en %s", env_path)
     sys.exit(1)  # Salir si no hay .env
 
 # Configuración de la conexión a MySQL
@@ -39,109 +47,154 @@ config = {
 # Verificar que las variables estén cargadas
 for key, value in config.items():
     if not value:
-        print(f"Error: La variable de entorno {key.upper()} no está definida en .env")
+        log.error("La variable de entorno %s no está definida en .env", key.upper())
         sys.exit(1)
 
-# Función para ejecutar una consulta y devolver un DataFrame
-def ejecutar_consulta(query):
+# Estilos de los encabezados (se crean una sola vez y se comparten entre celdas)
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+THIN_SIDE = Side(border_style="thin", color="000000")
+HEADER_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+HEADER_ALIGN = Alignment(horizontal="center", vertical="center")
+HEADER_STYLE = NamedStyle(name="encabezado", font=HEADER_FONT, fill=HEADER_FILL,
+                          border=HEADER_BORDER, alignment=HEADER_ALIGN)
+
+# Función para ejecutar una consulta y devolver sus columnas y filas (sin pasar por pandas)
+def ejecutar_consulta(query, params=()):
     conn = None
+    cursor = None
     try:
-        print(f"Intentando conectar con: host={config['host']}, user={config['user']}, db={config['database']}")
-        conn = mysql.connector.connect(**config)
+        conn = mysql.connector.connect(**config)  # Se conecta en el hilo de la consulta, en paralelo con las demás
+        # Los valores se envían como parámetros (nunca dentro del texto SQL) para evitar inyección
         cursor = conn.cursor()
-        cursor.execute(query)
+        cursor.execute(query, params)
         rows = cursor.fetchall()
         columns = [col[0] for col in cursor.description]
-        return pd.DataFrame(rows, columns=columns)
+        return columns, rows
     except mysql.connector.Error as e:
-        print(f"Error específico de MySQL: {e}")
-        print(f"Código de error: {e.errno}, Mensaje: {e.msg}")
-        return pd.DataFrame()
+        log.error("Error específico de MySQL: %s", e)
+        log.error("Código de error: %s, Mensaje: %s", e.errno, e.msg)
+        return [], []
     except Exception as e:
-        print(f"Error inesperado: {type(e).__name__} - {str(e)}")
-        return pd.DataFrame()
+        log.error("Error inesperado: %s - %s", type(e).__name__, e)
+        return [], []
     finally:
-        if conn and conn.is_connected():
+        if cursor:
             cursor.close()
+        if conn:
             conn.close()
 
-# Función para guardar DataFrame en una hoja de Excel
-def guardar_en_excel(df, writer, sheet_name):
-    df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-    # Obtener la hoja de trabajo
-    workbook = writer.book
-    worksheet = workbook[sheet_name]
-
-    # Definir estilo para encabezados
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-    border_style = Side(border_style="thin", color="000000")
-
-    # Aplicar formato a los encabezados
-    for cell in worksheet[1]:  # Primera fila (encabezados)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = Border(left=border_style, right=border_style, top=border_style, bottom=border_style)
-
-    # Autoajustar el ancho de las columnas
-    for col in worksheet.columns:
-        max_length = max((len(str(cell.value)) for cell in col if cell.value), default=10)
-        col_letter = col[0].column_letter  # Obtener letra de la columna
-        worksheet.column_dimensions[col_letter].width = max_length + 5  # Aumentar de +2 a +5
-
-    # Aplicar formato de moneda a columnas que contengan "Monto" o "Balance"
-    for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row):
-        for cell in row:
-            if "Monto" in worksheet.cell(row=1, column=cell.column).value or "Balance" in worksheet.cell(row=1, column=cell.column).value:
+# Función para lanzar varias consultas en paralelo, cada una en su hilo y con su propia conexión.
+# Devuelve una tarea por hoja para poder esperar cada resultado por separado.
+def lanzar_consultas(consultas):
+    log.debug("Intentando conectar con: host=%s, user=%s, db=%s", config['host'], config['user'], config['database'])
+    return {nombre_hoja: asyncio.create_task(asyncio.to_thread(ejecutar_consulta, query, params))
+            for nombre_hoja, (query, params) in consultas.items()}
+
+# Función para escribir una hoja de Excel (libro en modo write_only) a partir de sus filas
+def escribir_hoja(workbook, sheet_name, columnas, filas, anchos):
+    worksheet = workbook.create_sheet(sheet_name)
+
+    # Sin columnas (por ejemplo, un DataFrame vacío) no hay encabezados ni filtro que aplicar
+    if not columnas:
+        log.debug("La hoja '%s' no tiene columnas; se deja vacía.", sheet_name)
+        return
+
+    if HEADER_STYLE.name not in workbook.named_styles:
+        workbook.add_named_style(HEADER_STYLE)
+
+    # Una sola pasada por las columnas: ancho (en modo write_only debe fijarse antes de escribir filas),
+    # encabezado con formato y detección de columnas de moneda ("Monto" o "Balance")
+    encabezados = []
+    columnas_moneda = []
+    for i, (columna, ancho) in enumerate(zip(columnas, anchos)):
+        worksheet.column_dimensions[get_column_letter(i + 1)].width = int(ancho) + 5  # Aumentar de +2 a +5
+        cell = WriteOnlyCell(worksheet, value=columna)
+        cell.style = HEADER_STYLE.name
+        encabezados.append(cell)
+        if "Monto" in columna or "Balance" in columna:
+            columnas_moneda.append(i)
+    worksheet.append(encabezados)
+
+    # Escribir las filas
+    for fila in filas:
+        if columnas_moneda:
+            fila = list(fila)
+            for i in columnas_moneda:
+                cell = WriteOnlyCell(worksheet, value=fila[i])
                 cell.number_format = numbers.FORMAT_CURRENCY_USD_SIMPLE  # Formato de moneda $
+                fila[i] = cell
+        worksheet.append(fila)
 
     # Agregar filtros automáticos a los encabezados
-    last_column_letter = openpyxl.utils.get_column_letter(worksheet.max_column)
+    last_column_letter = get_column_letter(len(columnas))
     filter_range = f"A1:{last_column_letter}1"  # Rango desde A1 hasta la última columna de la fila 1
     worksheet.auto_filter.ref = filter_range
 
-    print(f"Formato y filtros aplicados a la hoja '{sheet_name}' correctamente.")
+    log.debug("Formato y filtros aplicados a la hoja '%s' correctamente.", sheet_name)
+
+# Función para guardar DataFrame en una hoja de Excel
+def guardar_en_excel(df, workbook, sheet_name):
+    # Hoja sin datos: solo encabezados, sin revisar valores ni medir anchos
+    if df.empty:
+        guardar_filas_en_excel(list(df.columns), [], workbook, sheet_name)
+        return
+
+    # Las celdas vacías (NaN/NaT) se escriben en blanco, igual que con to_excel
+    if df.isna().values.any():
+        df = df.astype(object).where(df.notna(), None)
+
+    anchos = [max(len(str(columna)), df[columna].astype(str).str.len().max()) for columna in df.columns]
+    escribir_hoja(workbook, sheet_name, list(df.columns), df.itertuples(index=False, name=None), anchos)
+
+# Función para volcar las filas de una consulta directamente en una hoja de Excel
+def guardar_filas_en_excel(columnas, filas, workbook, sheet_name):
+    if not filas:  # Sin filas: ancho mínimo de 10 para los encabezados
+        escribir_hoja(workbook, sheet_name, columnas, filas, [max(len(str(columna)), 10) for columna in columnas])
+        return
+
+    # Medición en Python sobre cada valor (no hay DataFrame para vectorizar); los NULL no cuentan
+    anchos = [len(str(columna)) for columna in columnas]
+    for i, valores in enumerate(zip(*filas)):
+        anchos[i] = max(anchos[i], max((len(str(valor)) for valor in valores if valor is not None), default=0))
+    escribir_hoja(workbook, sheet_name, columnas, filas, anchos)
 
 # Función para generar el resumen de ingresos, egresos y balance
 def generar_resumen(df_ingresos, df_egresos, anio):
     # Asegurarse que los DataFrames tengan datos
     if df_ingresos.empty or df_egresos.empty:
-        print("Advertencia: Los DataFrames de ingresos o egresos están vacíos")
+        log.warning("Los DataFrames de ingresos o egresos están vacíos")
         
     # Crear conjuntos completos de meses (1-12) para asegurar continuidad
     meses_completos = pd.DataFrame({
-        'Año': [int(anio)] * 12,
-        'Mes': list(range(1, 13))
+        'Año': np.full(12, int(anio), dtype=np.int64),
+        'Mes': np.arange(1, 13, dtype=np.int64)
     })
     
-    # Hacer merge con los datos reales, priorizando tener todos los meses
-    df_ingresos_completo = pd.merge(meses_completos, df_ingresos, 
-                                   on=['Año', 'Mes'], how='left').infer_objects(copy=False).fillna(0)
-    df_egresos_completo = pd.merge(meses_completos, df_egresos, 
-                                  on=['Año', 'Mes'], how='left').infer_objects(copy=False).fillna(0)
-    
-    # Unir ingresos y egresos
-    df_resumen = pd.merge(df_ingresos_completo, df_egresos_completo, 
-                         on=["Año", "Mes"], how="outer", 
-                         suffixes=("_Ingresos", "_Egresos")).fillna(0)
-    
-    # Calcular balance
-    df_resumen["Monto_Ingresos"] = df_resumen["Monto_Ingresos"].apply(lambda x: Decimal(str(x)))
-    df_resumen["Monto_Egresos"] = df_resumen["Monto_Egresos"].apply(lambda x: Decimal(str(x)))
-    df_resumen["Balance"] = df_resumen["Monto_Ingresos"] - df_resumen["Monto_Egresos"]
+    # Montos de cada mes en centavos (int64), para que la resta del balance sea exacta
+    claves = ['Año', 'Mes']
+    centavos = [
+        np.rint(df.set_index(claves)['Monto'].astype("float64").fillna(0) * 100).astype(np.int64).rename(nombre)
+        for df, nombre in ((df_ingresos, "Monto_Ingresos"), (df_egresos, "Monto_Egresos"))
+    ]
+
+    # Unir ingresos y egresos sobre los 12 meses en un solo join (falla si hay meses duplicados)
+    montos = ["Monto_Ingresos", "Monto_Egresos"]
+    df_resumen = meses_completos.set_index(claves).join(centavos, how='left', validate='one_to_one').reset_index()
+    df_resumen[montos] = df_resumen[montos].fillna(0).astype(np.int64)
     
-    # Ordenar por año y mes
-    df_resumen = df_resumen.sort_values(by=["Año", "Mes"])
+    # Calcular balance en centavos y pasar todo a pesos solo para escribirlo en Excel
+    df_resumen["Balance"] = df_resumen["Monto_Ingresos"].to_numpy() - df_resumen["Monto_Egresos"].to_numpy()
+    df_resumen[montos + ["Balance"]] = df_resumen[montos + ["Balance"]] / 100
     
-    # Convertir los nombres de los meses a texto para mejorar el gráfico
-    meses_nombres = {
-        1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril', 
-        5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
-        9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
-    }
-    df_resumen['Mes_Nombre'] = df_resumen['Mes'].map(meses_nombres)
+    # Nombres de los meses como categoría ordenada; el join ya deja las filas en orden de mes
+    meses_nombres = [
+        'Enero', 'Febrero', 'Marzo', 'Abril',
+        'Mayo', 'Junio', 'Julio', 'Agosto',
+        'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'
+    ]
+    df_resumen['Mes_Nombre'] = pd.Categorical.from_codes(df_resumen['Mes'].to_numpy() - 1,
+                                                         categories=meses_nombres, ordered=True)
     
     # Reordenar columnas
     cols = ['Año', 'Mes', 'Mes_Nombre', 'Monto_Ingresos', 'Monto_Egresos', 'Balance']
@@ -149,25 +202,25 @@ def generar_resumen(df_ingresos, df_egresos, anio):
     
     return df_resumen
 
-# Función para agregar gráficos al Excel con soporte para versiones antiguas de openpyxl
-def agregar_graficos(nombre_archivo):
+# Función para agregar gráficos al libro (antes de guardarlo) con soporte para versiones antiguas de openpyxl
+def agregar_graficos(wb, max_row):
     try:
-        wb = openpyxl.load_workbook(nombre_archivo)
-        
         # Verificar si la hoja existe
         if "Resumen" not in wb.sheetnames:
-            print("La hoja 'Resumen' no existe en el archivo.")
+            log.warning("La hoja 'Resumen' no existe en el libro.")
             return
             
         ws = wb["Resumen"]
 
         # Eliminar gráficos existentes (si los hay)
-        for chart in ws._charts:
-            ws._charts.remove(chart)
+        ws._charts.clear()
+
+        # La hoja en modo write_only no expone max_row: se recibe la última fila con datos
+        log.debug("Número de filas en la hoja: %d", max_row)
 
-        # Encontrar la última fila con datos
-        max_row = ws.max_row
-        print(f"Número de filas en la hoja: {max_row}")
+        # Referencias fijas del resumen: categorías en C (Mes_Nombre) y series en D, E y F
+        categories = Reference(ws, min_col=3, max_col=3, min_row=2, max_row=max_row)
+        referencias = {col: Reference(ws, min_col=col, max_col=col, min_row=1, max_row=max_row) for col in (4, 5, 6)}
         
         # Configurar gráfico de barras
         chart_bar = BarChart()
@@ -176,25 +229,19 @@ def agregar_graficos(nombre_archivo):
         chart_bar.x_axis.title = "Meses"
         chart_bar.style = 10
         
-        # Usar nombres de meses como categorías (columna C: Mes_Nombre)
-        categories = Reference(ws, min_col=3, min_row=2, max_row=max_row)
-        
-       # Datos de ingresos (columna D)
-        values_ingresos = Reference(ws, min_col=4, max_col=4, min_row=1, max_row=max_row)
-        chart_bar.add_data(values_ingresos, titles_from_data=True)
-
-        # Datos de egresos (columna E)
-        values_egresos = Reference(ws, min_col=5, max_col=5, min_row=1, max_row=max_row)
-        chart_bar.add_data(values_egresos, titles_from_data=True)
+        # Datos de ingresos (columna D) y egresos (columna E)
+        chart_bar.add_data(referencias[4], titles_from_data=True)
+        chart_bar.add_data(referencias[5], titles_from_data=True)
         
         chart_bar.set_categories(categories)
         
         try:
             # Intentar configurar marcadores para versiones más recientes
+            marcador = Marker(symbol="circle", size=8)  # Compartido por todas las series
             for s in chart_bar.series:
-                s.marker = Marker(symbol="circle", size=8)
+                s.marker = marcador
         except (AttributeError, TypeError):
-            print("Nota: La versión de openpyxl no soporta configuración directa de marcadores.")
+            log.info("La versión de openpyxl no soporta configuración directa de marcadores.")
             
         # Añadir gráfico de barras a la hoja
         ws.add_chart(chart_bar, "H2")
@@ -207,29 +254,27 @@ def agregar_graficos(nombre_archivo):
         chart_line.style = 13
         
         # Datos del balance (columna F)
-        values_balance = Reference(ws, min_col=6, max_col=6, min_row=1, max_row=max_row)
-        chart_line.add_data(values_balance, titles_from_data=True)
+        chart_line.add_data(referencias[6], titles_from_data=True)
         chart_line.set_categories(categories)
         
         try:
             # Intentar configurar marcadores para versiones más recientes
+            marcador = Marker(symbol="diamond", size=8)
             for s in chart_line.series:
-                s.marker = Marker(symbol="diamond", size=8)
+                s.marker = marcador
         except (AttributeError, TypeError):
-            print("Nota: La versión de openpyxl no soporta configuración directa de marcadores.")
+            log.info("La versión de openpyxl no soporta configuración directa de marcadores.")
             
         # Añadir gráfico de líneas a la hoja
         ws.add_chart(chart_line, "H18")
         
-        # Guardar el archivo
-        wb.save(nombre_archivo)
-        print("Gráficos agregados correctamente.")
+        log.debug("Gráficos agregados correctamente.")
         
     except Exception as e:
-        print(f"Error al agregar gráficos: {e}")
+        log.error("Error al agregar gráficos: %s", e)
 
 # **MAIN: Ejecutar todo el proceso**
-def main():
+async def main():
     # Lista de niveles disponibles
     niveles_disponibles = {
         "1": "Inicial",
@@ -267,75 +312,86 @@ def main():
         "Terciario": 4
     }
     
-    # Definir consultas (unchanged)
+    # Definir consultas: (SQL con parámetros %s, valores de los parámetros)
     consultas = {
-        "Ingresos": f"SELECT * FROM ingresosinicial WHERE Nivel='{nivel}' AND Año='{anio}' ORDER BY `ingresosinicial`.`Fecha` ASC",
-        "Egresos": f"SELECT * FROM egresosinicial WHERE `egresosinicial`.`nivel` = '{nivel}' AND Año='{anio}' ORDER BY `egresosinicial`.`Fecha` ASC",
-        "Ingresos Mensuales": f""" 
+        "Ingresos": ("SELECT * FROM ingresosinicial WHERE Nivel=%s AND Año=%s ORDER BY `ingresosinicial`.`Fecha` ASC",
+                     (nivel, anio)),
+        "Egresos": ("SELECT * FROM egresosinicial WHERE `egresosinicial`.`nivel` = %s AND Año=%s ORDER BY `egresosinicial`.`Fecha` ASC",
+                    (nivel, anio)),
+        "Ingresos Mensuales": (""" 
             SELECT year(`created`) 'Año', 
                 month(`created`) 'Mes', 
                 SUM(`monto`) 'Monto' 
             FROM `ingresos` 
-            WHERE (SELECT alumnos.nivele_id FROM alumnos WHERE alumnos.id = ingresos.alumno_id) = '{niveles[nivel]}' 
-                AND YEAR(`created`)='{anio}' 
+            WHERE (SELECT alumnos.nivele_id FROM alumnos WHERE alumnos.id = ingresos.alumno_id) = %s 
+                AND YEAR(`created`)=%s 
             GROUP BY year(`created`), month(`created`)
             ORDER BY year(`created`), month(`created`)
-        """,
-        "Egresos Mensuales": f""" 
+        """, (niveles[nivel], anio)),
+        "Egresos Mensuales": (""" 
             SELECT year(fecha_pago) 'Año', 
                 month(fecha_pago) 'Mes', 
                 sum(monto_pagado) 'Monto' 
             FROM `erogaciones` 
-            WHERE year(fecha_pago)='{anio}' AND nivel='{nivel}' 
+            WHERE year(fecha_pago)=%s AND nivel=%s 
             GROUP BY year(fecha_pago), month(fecha_pago)
             ORDER BY year(fecha_pago), month(fecha_pago)
-        """,
-        "Matricula": f"SELECT * FROM ingresosinicial WHERE Nivel='{nivel}' AND Año='{anio}' AND Concepto LIKE '%Matricula%' ORDER BY `ingresosinicial`.`Fecha` ASC",
-        "Nomina de Estudiantes": f"""
+        """, (anio, nivel)),
+        "Matricula": ("SELECT * FROM ingresosinicial WHERE Nivel=%s AND Año=%s AND Concepto LIKE %s ORDER BY `ingresosinicial`.`Fecha` ASC",
+                      (nivel, anio, "%Matricula%")),
+        "Nomina de Estudiantes": ("""
             SELECT _nombre_nivel(`nivele_id`) 'Nivel',
                 `estado` 'Sala / Grado',
                 `apellido` 'Apellido',
                 `nombre` 'Nombre',
                 `dni` 'DNI / CUIL'
             FROM `alumnos`
-            WHERE `nivele_id`='{niveles[nivel]}'
+            WHERE `nivele_id`=%s
             ORDER BY `estado`, `apellido`, `nombre`
-        """
+        """, (niveles[nivel],))
     }
 
-    with pd.ExcelWriter(nombre_archivo, engine="openpyxl") as writer:
-        dataframes = {}
-        hojas_escritas = False  # Bandera para verificar si se escribió algo
-
-        # Ejecutar consultas y guardar en Excel
-        for nombre_hoja, query in consultas.items():
-            df = ejecutar_consulta(query)
-            print(f"Consulta {nombre_hoja}: {len(df)} filas")
-            if not df.empty:  # Solo guardar si hay datos
-                guardar_en_excel(df, writer, nombre_hoja)
-                dataframes[nombre_hoja] = df
-                hojas_escritas = True
-
-        # Generar y guardar resumen solo si hay datos
-        if "Ingresos Mensuales" in dataframes and "Egresos Mensuales" in dataframes:
-            df_resumen = generar_resumen(dataframes["Ingresos Mensuales"], dataframes["Egresos Mensuales"], anio)
-            print("Resumen generado con éxito.")
-            print(f"Dimensiones del resumen: {df_resumen.shape}")
-            df_resumen["Monto_Ingresos"] = pd.to_numeric(df_resumen["Monto_Ingresos"], errors="coerce")
-            df_resumen["Monto_Egresos"] = pd.to_numeric(df_resumen["Monto_Egresos"], errors="coerce")
-            df_resumen["Balance"] = pd.to_numeric(df_resumen["Balance"], errors="coerce")
-            guardar_en_excel(df_resumen, writer, "Resumen")
-            hojas_escritas = True
-
-        if not hojas_escritas:
-            print("No se generaron datos. Creando hoja vacía para evitar error.")
-            pd.DataFrame({"Mensaje": ["No hay datos disponibles"]}).to_excel(writer, sheet_name="Info", index=False)
-
-    # Agregar gráficos solo si hay datos relevantes
-    if hojas_escritas:
-        agregar_graficos(nombre_archivo)
+    # Lanzar todas las consultas en paralelo
+    tareas = lanzar_consultas(consultas)
+
+    workbook = Workbook(write_only=True)
+    dataframes = {}
+    hojas_escritas = False  # Bandera para verificar si se escribió algo
+
+    # Guardar los resultados en Excel a medida que llegan, en el orden de las hojas:
+    # mientras se escribe una hoja las consultas siguientes siguen ejecutándose.
+    # Solo las entradas del resumen pasan por pandas.
+    for nombre_hoja, tarea in tareas.items():
+        columnas, filas = await tarea
+        log.debug("Consulta %s: %d filas", nombre_hoja, len(filas))
+        if not filas:  # Solo guardar si hay datos
+            continue
+        if nombre_hoja in ("Ingresos Mensuales", "Egresos Mensuales"):
+            # Claves del resumen en int64, el mismo tipo que meses_completos
+            df = pd.DataFrame(filas, columns=columnas).astype({'Año': np.int64, 'Mes': np.int64})
+            guardar_en_excel(df, workbook, nombre_hoja)
+            dataframes[nombre_hoja] = df
+        else:
+            guardar_filas_en_excel(columnas, filas, workbook, nombre_hoja)
+        hojas_escritas = True
+
+    # Generar y guardar resumen solo si hay datos
+    if "Ingresos Mensuales" in dataframes and "Egresos Mensuales" in dataframes:
+        df_resumen = generar_resumen(dataframes["Ingresos Mensuales"], dataframes["Egresos Mensuales"], anio)
+        log.debug("Resumen generado con éxito: %d filas, %d columnas", *df_resumen.shape)
+        guardar_en_excel(df_resumen, workbook, "Resumen")
+        agregar_graficos(workbook, len(df_resumen) + 1)  # +1 por la fila de encabezados
+        hojas_escritas = True
+
+    if not hojas_escritas:
+        log.warning("No se generaron datos. Creando hoja vacía para evitar error.")
+        worksheet = workbook.create_sheet("Info")
+        worksheet.append(["Mensaje"])
+        worksheet.append(["No hay datos disponibles"])
+
+    workbook.save(nombre_archivo)
 
     print(f"Archivo Excel '{nombre_archivo}' generado con éxito.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('.env', '.')],
-    hiddenimports=['mysql.connector', 'mysql.connector.locales.eng'],
+    hiddenimports=['mysql.connector', 'mysql.connector.locales.eng', '_mysql_connector'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],